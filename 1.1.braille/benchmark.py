@@ -0,0 +1,81 @@
+"""
+Throughput of the Braille encoders, in MB of input text per second.
+
+Usage: python benchmark.py [megabytes]
+       python benchmark.py roundtrip [megabytes]
+"""
+import io
+import random
+import sys
+import time
+
+from solution import solution, encode, encodeFile, encodeUnicode, encodePacked
+from solution import decodeFile
+
+
+def sample(size):
+    """Random text of letters and spaces, about one capital in ten"""
+    random.seed(size)
+    letters = 'abcdefghijklmnopqrstuvwxyz       ABC'
+    return ''.join(random.choices(letters, k=size))
+
+
+def throughput(function, text):
+    start = time.perf_counter()
+    function(text)
+    elapsed = time.perf_counter() - start
+    return len(text) / elapsed / 1e6
+
+
+def streamed(text):
+    encodeFile(io.StringIO(text), io.StringIO())
+
+
+def roundtrip(megabytes):
+    """Encode with solution(), write to disk and decode through an mmap"""
+    import os
+    import tempfile
+
+    text = sample(int(megabytes * 1e6))
+
+    start = time.perf_counter()
+    braille = solution(text)
+    encoded = time.perf_counter()
+
+    fd, filename = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(braille)
+        del braille
+
+        decoding = time.perf_counter()
+        decoded = decodeFile(filename)
+        end = time.perf_counter()
+    finally:
+        os.remove(filename)
+
+    assert decoded == text
+    print('solution       %8.1f MB/s' % (len(text) / (encoded - start) / 1e6))
+    print('decodeFile     %8.1f MB/s' % (len(text) / (end - decoding) / 1e6))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['roundtrip']:
+        roundtrip(float(sys.argv[2]) if len(sys.argv) > 2 else 100)
+        sys.exit()
+
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    text = sample(int(megabytes * 1e6))
+
+    for name, function in (('solution', solution), ('encode', encode),
+                           ('encodeFile', streamed),
+                           ('encodeUnicode', encodeUnicode),
+                           ('encodePacked', encodePacked)):
+        print('%-14s %8.1f MB/s' % (name, throughput(function, text)))
+
+    # Output size per input character for each format
+    small = text[:100000]
+    for name, output in (('ascii', encode(small).encode('ascii')),
+                         ('unicode utf-8', encodeUnicode(small).encode('utf-8')),
+                         ('packed', encodePacked(small))):
+        print('%-14s %8.2f bytes/char' % (name, len(output) / float(len(small))))
@@ -1,37 +1,41 @@
-def solution(s):
-    # Translation matrix
-    toBraille = {
-        'a': '100000',
-        'b': '110000',
-        'c': '100100',
-        'd': '100110',
-        'e': '100010',
-        'f': '110100',
-        'g': '110110',
-        'h': '110010',
-        'i': '010100',
-        'j': '010110',
-        'k': '101000',
-        'l': '111000',
-        'm': '101100',
-        'n': '101110',
-        'o': '101010',
-        'p': '111100',
-        'q': '111110',
-        'r': '111010',
-        's': '011100',
-        't': '011110',
-        'u': '101001',
-        'v': '111001',
-        'w': '010111',
-        'x': '101101',
-        'y': '101111',
-        'z': '101011',
-        ' ': '000000'
-    }
-    # Capital prefix
-    CAPITAL = '000001'
+# Translation matrix
+toBraille = {
+    'a': '100000',
+    'b': '110000',
+    'c': '100100',
+    'd': '100110',
+    'e': '100010',
+    'f': '110100',
+    'g': '110110',
+    'h': '110010',
+    'i': '010100',
+    'j': '010110',
+    'k': '101000',
+    'l': '111000',
+    'm': '101100',
+    'n': '101110',
+    'o': '101010',
+    'p': '111100',
+    'q': '111110',
+    'r': '111010',
+    's': '011100',
+    't': '011110',
+    'u': '101001',
+    'v': '111001',
+    'w': '010111',
+    'x': '101101',
+    'y': '101111',
+    'z': '101011',
+    ' ': '000000'
+}
+# Capital prefix
+CAPITAL = '000001'
+
+# Default amount of characters read per chunk when streaming
+CHUNK_SIZE = 1 << 16
+
 
+def solution(s):
     # output array
     brailleArray = []
 
@@ -42,3 +46,263 @@ def solution(s):
         brailleArray.append( toBraille[letter.lower()])
 
     return ''.join(brailleArray)
+
+
+def buildTranslationTable():
+    """
+    Build a str.translate table from toBraille, with the capital prefix
+    already attached to the upper case letters.
+    """
+    table = {}
+    for letter, cell in toBraille.items():
+        table[ord(letter)] = cell
+        if letter.upper() != letter:
+            table[ord(letter.upper())] = CAPITAL + cell
+    return table
+
+translationTable = buildTranslationTable()
+
+# Same keys, all deleted: whatever survives is not translatable
+unknownTable = dict.fromkeys(translationTable)
+
+
+def checkEncodable(s):
+    """
+    str.translate leaves unknown characters in place, while solution() raises
+    KeyError on them. Do the same.
+    """
+    unknown = s.translate(unknownTable)
+    if unknown:
+        raise KeyError(unknown[0])
+
+
+def encode(s):
+    """
+    Same output as solution(s), but a single str.translate pass over the
+    precomputed table.
+    """
+    checkEncodable(s)
+
+    return s.translate(translationTable)
+
+
+def readChunks(source, chunkSize=CHUNK_SIZE):
+    """
+    Read a file object (text, binary or mmap) in chunks of chunkSize
+    characters. Binary chunks are decoded as ascii.
+    """
+    while True:
+        chunk = source.read(chunkSize)
+        if not chunk:
+            return
+        if not isinstance(chunk, str):
+            chunk = chunk.decode('ascii')
+        yield chunk
+
+
+def encodeChunks(chunks):
+    """
+    Generator version of solution: encode each chunk of text as it arrives, so
+    memory depends on the chunk size and not on the whole document.
+    """
+    for chunk in chunks:
+        yield encode(chunk)
+
+
+def encodeFile(source, destination, chunkSize=CHUNK_SIZE):
+    """
+    Stream the text from source into Braille on destination (both file
+    objects). Returns the number of characters written.
+    """
+    written = 0
+    for encoded in encodeChunks(readChunks(source, chunkSize)):
+        destination.write(encoded)
+        written += len(encoded)
+    return written
+
+
+# Compact output formats ------------------------------------------------------
+#
+# A cell is stored as its dots bitmask: dot n (1..6) is bit (n - 1). That is
+# exactly the offset of the cell in the Unicode Braille block (U+2800), so both
+# formats share the same codes. The packed format stores 4 cells in 3 bytes.
+
+BRAILLE_BLOCK = 0x2800
+
+# The full cell is not used by any character, so it pads the packed format
+PADDING = 0b111111
+
+
+def cellToCode(cell):
+    """Convert a '100100' style cell into its dots bitmask"""
+    code = 0
+    for dot, bump in enumerate(cell):
+        if bump == '1':
+            code |= 1 << dot
+    return code
+
+
+def buildCodeTables(offset):
+    """
+    Build the encoding table (character -> code chars, capital included) and
+    the decoding table (code char -> character) from toBraille.
+    The capital prefix decodes to a NUL marker that decodeCodes resolves.
+    """
+    capital = chr(offset + cellToCode(CAPITAL))
+    encoding = {}
+    decoding = {ord(capital): u'\0'}
+    for letter, cell in toBraille.items():
+        code = chr(offset + cellToCode(cell))
+        encoding[ord(letter)] = code
+        decoding[ord(code)] = letter
+        if letter.upper() != letter:
+            encoding[ord(letter.upper())] = capital + code
+    return encoding, decoding
+
+codeEncoding, codeDecoding = buildCodeTables(0)
+unicodeEncoding, unicodeDecoding = buildCodeTables(BRAILLE_BLOCK)
+
+
+def decodeCodes(codes, decoding):
+    """
+    Translate a string of code chars back into text.
+    Every NUL marker (capital prefix) upper-cases the letter after it.
+    """
+    # A code without a character survives the deletion
+    if codes.translate(dict.fromkeys(decoding)):
+        raise ValueError('invalid Braille cell')
+
+    text = codes.translate(decoding)
+
+    if u'\0' not in text:
+        return text
+
+    parts = text.split(u'\0')
+    for part in parts[1:]:
+        if not part[:1].islower():
+            raise ValueError('capital prefix must be followed by a letter')
+    return parts[0] + ''.join(part[:1].upper() + part[1:] for part in parts[1:])
+
+
+def encodeUnicode(s):
+    """Encode s as Unicode Braille characters (U+2800 block)"""
+    checkEncodable(s)
+
+    return s.translate(unicodeEncoding)
+
+
+def decodeUnicode(u):
+    """Decode the output of encodeUnicode back to text"""
+    return decodeCodes(u, unicodeDecoding)
+
+
+def encodePacked(s):
+    """
+    Encode s with 6 bits per cell: every 4 cells are packed into 3 bytes (the
+    first cell on the highest bits). The last group is filled with PADDING.
+    """
+    import numpy as np
+
+    checkEncodable(s)
+
+    chars = np.frombuffer(s.encode('ascii'), dtype=np.uint8)
+    lookup = np.zeros(256, dtype=np.uint32)
+    for code, cell in codeEncoding.items():
+        lookup[code] = ord(cell[-1])
+
+    # every upper case letter takes one more cell, for the capital prefix
+    upper = (chars >= ord('A')) & (chars <= ord('Z'))
+    positions = np.arange(chars.size) + np.cumsum(upper)
+    size = chars.size + int(np.count_nonzero(upper))
+
+    codes = np.full(size + (-size % 4), PADDING, dtype=np.uint32)
+    codes[positions] = lookup[chars]
+    codes[positions[upper] - 1] = cellToCode(CAPITAL)
+
+    cells = codes.reshape(-1, 4)
+    groups = (cells[:, 0] << 18) | (cells[:, 1] << 12) | (cells[:, 2] << 6) | cells[:, 3]
+
+    # the 3 low bytes of every group, highest first
+    return groups.astype('>u4').view(np.uint8).reshape(-1, 4)[:, 1:].tobytes()
+
+
+def decodePacked(data):
+    """Decode the output of encodePacked back to text"""
+    import numpy as np
+
+    if len(data) % 3:
+        raise ValueError('packed Braille length must be a multiple of 3')
+
+    packed = np.frombuffer(bytes(data), dtype=np.uint8).reshape(-1, 3).astype(np.uint32)
+    groups = (packed[:, 0] << 16) | (packed[:, 1] << 8) | packed[:, 2]
+
+    codes = np.empty((groups.size, 4), dtype=np.uint8)
+    for cell in range(4):
+        codes[:, cell] = (groups >> (18 - 6 * cell)) & 0x3f
+    codes = codes.ravel()
+
+    # padding only shows up at the end of the last group
+    end = codes.size
+    while end and codes[end - 1] == PADDING:
+        end -= 1
+
+    return decodeCodes(codes[:end].tobytes().decode('latin-1'), codeDecoding)
+
+
+# Vectorized decoder ----------------------------------------------------------
+
+def decodeBraille(data):
+    """
+    Decode the output of solution() back to text using NumPy.
+
+    data can be a str, bytes or any buffer (e.g. an mmap). The stream is
+    reshaped into 6 dot cells, every cell is turned into its code, and the
+    characters are looked up in a single gather. Capital prefixes are applied
+    as a mask over the cell that follows them.
+    """
+    import numpy as np
+
+    if isinstance(data, str):
+        data = data.encode('ascii')
+
+    bits = np.frombuffer(data, dtype=np.uint8) - ord('0')
+    if bits.size % 6:
+        raise ValueError('Braille length must be a multiple of 6')
+    if bits.size and bits.max() > 1:
+        raise ValueError('Braille must only contain 0 and 1')
+
+    # dot n is bit (n - 1), same codes as cellToCode
+    weights = 1 << np.arange(6, dtype=np.uint8)
+    codes = bits.reshape(-1, 6) @ weights
+
+    # code -> ascii, 0 for cells without a character
+    lookup = np.zeros(64, dtype=np.uint8)
+    for letter, cell in toBraille.items():
+        lookup[cellToCode(cell)] = ord(letter)
+
+    capital = codes == cellToCode(CAPITAL)
+    chars = lookup[codes]
+
+    # every cell after a capital prefix must be a letter
+    upper = np.zeros_like(capital)
+    upper[1:] = capital[:-1]
+    letters = chars[upper]
+    if capital[-1:].any() or not np.all(letters >= ord('a')):
+        raise ValueError('capital prefix must be followed by a letter')
+    if not np.all(chars[~capital]):
+        raise ValueError('invalid Braille cell')
+
+    chars[upper] = letters - (ord('a') - ord('A'))
+
+    return chars[~capital].tobytes().decode('ascii')
+
+
+def decodeFile(filename):
+    """Decode a file holding the output of solution() through an mmap"""
+    import mmap
+
+    with open(filename, 'rb') as f:
+        if not f.read(1):
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return decodeBraille(m)
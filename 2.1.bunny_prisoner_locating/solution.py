@@ -1,3 +1,6 @@
+from math import isqrt
+
+
 def solution(x, y):
 
     # | 7
@@ -6,7 +9,7 @@ def solution(x, y):
     # | 1 3 6 10
 
     def sum1to(n):
-        return (n*(n+1))/2
+        return (n*(n+1))//2
 
     # if right edge is (n,1)
     # then triangle size = 1 + 2 + 3... = n(n+1)/2
@@ -23,3 +26,88 @@ def solution(x, y):
     id = bottomValue + Sx
 
     return str(id)
+
+
+# Batch and inverse API --------------------------------------------------------
+#
+# The cell (x, y) sits on diagonal d = x + y - 1, and the diagonals before it
+# hold 1 + 2 + ... + (d - 1) prisoners, so:
+#   id = (d - 1) * d / 2 + x
+#
+# Going back, d is the smallest diagonal with d * (d + 1) / 2 >= id.
+
+# Largest coordinate for which (d - 1) * d still fits in an int64
+MAX_INT64_COORDINATE = 1518500249
+
+
+def cellId(x, y):
+    """Exact prisoner ID (as an int) of the bunny at (x, y)"""
+    d = x + y - 1
+    return (d - 1) * d // 2 + x
+
+
+def cellIds(points):
+    """
+    Prisoner IDs for many (x, y) pairs at once.
+
+    points can be a NumPy array of shape (n, 2) or any iterable of pairs.
+    Returns an int64 NumPy array, or an object array of Python ints if some
+    ID does not fit in an int64.
+    """
+    import numpy as np
+
+    if not isinstance(points, np.ndarray):
+        points = list(points)
+    points = np.asarray(points).reshape(-1, 2)
+    if points.size and points.dtype.kind not in 'iuO':
+        raise TypeError('coordinates must be integers, not %s' % points.dtype)
+
+    if points.size and (points.dtype == object or
+                        points.max() > MAX_INT64_COORDINATE):
+        return np.array([cellId(int(x), int(y)) for x, y in points], dtype=object)
+
+    # both columns, or unsigned input would promote to float64
+    points = points.astype(np.int64)
+    x = points[:, 0]
+    d = x + points[:, 1] - 1
+    return (d - 1) * d // 2 + x
+
+
+# Largest ID handled with int64 arrays
+MAX_INT64_ID = cellId(MAX_INT64_COORDINATE, MAX_INT64_COORDINATE)
+
+
+def cellLocation(id):
+    """Inverse of cellId: the (x, y) cell of the bunny with this ID"""
+    # smallest d with d * (d + 1) / 2 >= id
+    d = (isqrt(8 * id - 7) + 1) // 2
+    x = id - (d - 1) * d // 2
+    return x, d - x + 1
+
+
+def cellLocations(ids):
+    """
+    Inverse of cellIds: an (n, 2) array with the (x, y) cell of each ID.
+    Falls back to Python ints (object array) for IDs beyond the int64 range.
+    """
+    import numpy as np
+
+    if not isinstance(ids, np.ndarray):
+        ids = list(ids)
+    ids = np.asarray(ids).reshape(-1)
+    if ids.size and ids.dtype.kind not in 'iuO':
+        raise TypeError('IDs must be integers, not %s' % ids.dtype)
+
+    if ids.size and (ids.dtype == object or
+                     ids.max() > MAX_INT64_ID):
+        return np.array([cellLocation(int(id)) for id in ids], dtype=object).reshape(-1, 2)
+
+    ids = ids.astype(np.int64)
+
+    # float estimate of the diagonal, then fix rounding errors exactly
+    d = ((np.sqrt(8.0 * ids - 7) + 1) // 2).astype(np.int64)
+    d -= (d - 1) * d // 2 >= ids
+    d += d * (d + 1) // 2 < ids
+
+    x = ids - (d - 1) * d // 2
+    return np.stack((x, d - x + 1), axis=1)
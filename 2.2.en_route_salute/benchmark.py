@@ -0,0 +1,69 @@
+"""
+Scaling of solution() against the single pass countSalutes().
+
+Usage: python benchmark.py [largest hallway length]
+       python benchmark.py parallel [hallway length]
+"""
+import random
+import sys
+import time
+
+from solution import solution, countSalutes, parallelSaluteFile
+
+
+def hallway(size):
+    random.seed(size)
+    return ''.join(random.choices('<->', k=size))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def parallel(size):
+    """Speedup of parallelSaluteFile for 1 to cpu_count workers"""
+    import os
+    import tempfile
+
+    fd, filename = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(hallway(size))
+
+        base = None
+        workers = 1
+        while True:
+            result, elapsed = timed(parallelSaluteFile, filename, workers)
+            base = base or elapsed
+            print('%3d workers %9.4fs  speedup %5.2fx  (%5.2fx per core)' %
+                  (workers, elapsed, base / elapsed, base / elapsed / workers))
+            if workers >= os.cpu_count():
+                break
+            workers = min(2 * workers, os.cpu_count())
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['parallel']:
+        parallel(int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 8)
+        sys.exit()
+
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+
+    size = 1000
+    while size <= largest:
+        s = hallway(size)
+        fast, fastTime = timed(countSalutes, [s])
+
+        # the quadratic version quickly becomes hopeless
+        if size <= 20000:
+            slow, slowTime = timed(solution, s)
+            assert slow == fast
+            print('%10d  solution %9.4fs  countSalutes %9.4fs' % (size, slowTime, fastTime))
+        else:
+            print('%10d  solution         -   countSalutes %9.4fs' % (size, fastTime))
+
+        size *= 10
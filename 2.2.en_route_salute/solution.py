@@ -1,3 +1,11 @@
+import itertools
+import mmap
+import os
+from functools import reduce
+from multiprocessing import Pool
+from random import random
+
+
 def solution(s):
     # constants
     WAKING_RIGHT = '>'
@@ -25,3 +33,295 @@ def solution(s):
             encouters += countEmployeesInOderDirection(hallway[:index], WAKING_RIGHT)
 
     return encouters
+
+
+# Linear streaming mode --------------------------------------------------------
+#
+# Every pair of a '>' followed (anywhere ahead) by a '<' meets exactly once, and
+# both salute, so the answer is twice the number of those pairs. Keeping a
+# running count of '>' seen so far, each '<' adds that count.
+
+# Default amount of characters read per chunk when streaming
+CHUNK_SIZE = 1 << 20
+
+
+def summarizeChunks(chunks, walkingRight='>', walkingLeft='<'):
+    """
+    Single pass over an iterable of hallway chunks.
+    Returns a summary (right, left, pairs): the number of '>', the number of
+    '<', and the number of '>' ... '<' pairs inside the hallway.
+    """
+    pairs = 0
+    right = 0   # '>' seen so far
+    left = 0
+    for chunk in chunks:
+        # each piece ends right before a '<'; the last one has no '<' after it
+        pieces = chunk.split(walkingLeft)
+        for piece in pieces[:-1]:
+            right += piece.count(walkingRight)
+            pairs += right
+        right += pieces[-1].count(walkingRight)
+        left += len(pieces) - 1
+
+    return right, left, pairs
+
+
+def mergeSummaries(first, second):
+    """
+    Summary of two consecutive hallway sections. Every '>' of the first
+    section meets every '<' of the second one. The merge is associative.
+    """
+    right, left, pairs = first
+    secondRight, secondLeft, secondPairs = second
+    return (right + secondRight, left + secondLeft,
+            pairs + secondPairs + right * secondLeft)
+
+
+def countSalutes(chunks, walkingRight='>', walkingLeft='<'):
+    """
+    Single pass version of solution over an iterable of hallway chunks.
+    Memory depends on the chunk size only.
+    """
+    _, _, pairs = summarizeChunks(chunks, walkingRight, walkingLeft)
+    return 2 * pairs
+
+
+def readChunks(source, chunkSize=CHUNK_SIZE):
+    """Read a file object (text, binary or mmap) in chunks of chunkSize"""
+    while True:
+        chunk = source.read(chunkSize)
+        if not chunk:
+            return
+        yield chunk
+
+
+def saluteFile(source, chunkSize=CHUNK_SIZE):
+    """Count the salutes of a hallway stored in a file object"""
+    chunks = readChunks(source, chunkSize)
+
+    # binary files and mmaps yield bytes
+    first = next(chunks, '')
+    if isinstance(first, str):
+        return countSalutes(itertools.chain([first], chunks))
+    return countSalutes(itertools.chain([first], chunks), b'>', b'<')
+
+
+# Parallel mode ----------------------------------------------------------------
+#
+# The hallway file is split into one byte range per worker. Each worker maps the
+# file itself and summarizes its range, so only (filename, start, end) and the
+# summaries travel between processes.
+
+def summarizeRange(task):
+    """Summary of the bytes [start, end) of a hallway file"""
+    filename, start, end = task
+    with open(filename, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            chunks = (m[i:min(i + CHUNK_SIZE, end)]
+                      for i in range(start, end, CHUNK_SIZE))
+            return summarizeChunks(chunks, b'>', b'<')
+
+
+def parallelSaluteFile(filename, workers=None):
+    """Count the salutes of a hallway file using a pool of worker processes"""
+    size = os.path.getsize(filename)
+    if size == 0:
+        return 0
+
+    workers = workers or os.cpu_count()
+    step = -(-size // workers)
+    tasks = [(filename, start, min(start + step, size))
+             for start in range(0, size, step)]
+
+    with Pool(workers) as pool:
+        summaries = pool.map(summarizeRange, tasks)
+
+    _, _, pairs = reduce(mergeSummaries, summaries)
+    return 2 * pairs
+
+
+# Incremental mode -------------------------------------------------------------
+#
+# The hallway is kept as an implicit treap (a randomized balanced binary tree
+# ordered by position). Each node stores the summary of its subtree, so every
+# edit only recomputes the summaries along one root path, and any range of the
+# hallway can be cut out with two splits to read its summary.
+
+class Hallway(object):
+    """
+    A hallway that can be edited in O(log n) (expected) while keeping its
+    salute count up to date.
+    """
+
+    def __init__(self, s=''):
+        # Nodes live in parallel lists, node 0 is the empty tree
+        self.left = [0]
+        self.right = [0]
+        self.priority = [0.0]
+        self.char = ['']
+        self.size = [0]
+        self.summary = [(0, 0, 0)]
+        self.free = []
+
+        # Cartesian tree construction in O(n): keep the right spine on a stack
+        spine = []
+        for char in s:
+            node = self._newNode(char)
+            last = 0
+            while spine and self.priority[spine[-1]] < self.priority[node]:
+                last = spine.pop()
+            self.left[node] = last
+            if spine:
+                self.right[spine[-1]] = node
+            spine.append(node)
+
+        self.root = spine[0] if spine else 0
+
+        # children before parents (reversed preorder)
+        order = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            for child in (self.left[node], self.right[node]):
+                if child:
+                    stack.append(child)
+        for node in reversed(order):
+            self._update(node)
+
+    def __len__(self):
+        return self.size[self.root]
+
+    def __str__(self):
+        chars = []
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = self.left[node]
+            node = stack.pop()
+            chars.append(self.char[node])
+            node = self.right[node]
+        return ''.join(chars)
+
+    def salutes(self):
+        """Number of salutes in the whole hallway"""
+        return 2 * self.summary[self.root][2]
+
+    def rangeSalutes(self, i, j):
+        """Number of salutes between the employees in [i, j)"""
+        i, j = max(i, 0), min(j, len(self))
+        if i >= j:
+            return 0
+        before, rest = self._split(self.root, i)
+        middle, after = self._split(rest, j - i)
+        pairs = self.summary[middle][2]
+        self.root = self._merge(before, self._merge(middle, after))
+        return 2 * pairs
+
+    def __getitem__(self, index):
+        return self.char[self._find(index)]
+
+    def set(self, index, char):
+        """Replace the employee at index. Returns the new salute count"""
+        node = self._find(index)
+        before, rest = self._split(self.root, index)
+        middle, after = self._split(rest, 1)
+        self.char[node] = char
+        self._update(node)
+        self.root = self._merge(before, self._merge(middle, after))
+        return self.salutes()
+
+    def flip(self, index):
+        """Turn around the employee at index. Returns the new salute count"""
+        char = self[index]
+        return self.set(index, {'>': '<', '<': '>'}.get(char, char))
+
+    def insert(self, index, char):
+        """Insert an employee before index. Returns the new salute count"""
+        if not 0 <= index <= len(self):
+            raise IndexError('hallway index out of range')
+        node = self._newNode(char)
+        self._update(node)
+        before, after = self._split(self.root, index)
+        self.root = self._merge(self._merge(before, node), after)
+        return self.salutes()
+
+    def delete(self, index):
+        """Remove the employee at index. Returns the new salute count"""
+        self._find(index)
+        before, rest = self._split(self.root, index)
+        node, after = self._split(rest, 1)
+        self.free.append(node)
+        self.root = self._merge(before, after)
+        return self.salutes()
+
+    # Treap internals ----------------------------------------------------------
+
+    def _newNode(self, char):
+        if self.free:
+            node = self.free.pop()
+            self.left[node] = self.right[node] = 0
+            self.priority[node] = random()
+            self.char[node] = char
+            return node
+
+        self.left.append(0)
+        self.right.append(0)
+        self.priority.append(random())
+        self.char.append(char)
+        self.size.append(1)
+        self.summary.append((0, 0, 0))
+        return len(self.char) - 1
+
+    def _update(self, node):
+        """Recompute size and summary of node from its children"""
+        left, right = self.left[node], self.right[node]
+        char = self.char[node]
+        own = (1 if char == '>' else 0, 1 if char == '<' else 0, 0)
+        self.size[node] = self.size[left] + 1 + self.size[right]
+        self.summary[node] = mergeSummaries(
+            mergeSummaries(self.summary[left], own), self.summary[right])
+
+    def _find(self, index):
+        """Node at position index"""
+        if not 0 <= index < len(self):
+            raise IndexError('hallway index out of range')
+        node = self.root
+        while True:
+            leftSize = self.size[self.left[node]]
+            if index < leftSize:
+                node = self.left[node]
+            elif index == leftSize:
+                return node
+            else:
+                index -= leftSize + 1
+                node = self.right[node]
+
+    def _split(self, node, k):
+        """Split the tree into its first k employees and the rest"""
+        if not node:
+            return 0, 0
+        left = self.left[node]
+        if self.size[left] >= k:
+            first, second = self._split(left, k)
+            self.left[node] = second
+            self._update(node)
+            return first, node
+        first, second = self._split(self.right[node], k - self.size[left] - 1)
+        self.right[node] = first
+        self._update(node)
+        return node, second
+
+    def _merge(self, first, second):
+        """Concatenate two trees"""
+        if not first or not second:
+            return first or second
+        if self.priority[first] > self.priority[second]:
+            self.right[first] = self._merge(self.right[first], second)
+            self._update(first)
+            return first
+        self.left[second] = self._merge(first, self.left[second])
+        self._update(second)
+        return second
@@ -0,0 +1,40 @@
+"""
+solution() against the half-GCD engine on huge inputs.
+
+Usage: python benchmark.py [digits ...]     (default: 1000 10000 100000)
+"""
+import random
+import sys
+import time
+
+from solution import solution, halfGcdGenerations
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def generations(M, F):
+    """solution() without its decimal conversion, like halfGcdGenerations"""
+    result = solution(M, F)
+    return None if result == "impossible" else int(result)
+
+
+if __name__ == '__main__':
+    # str(int) is only used for small results here
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+
+    sizes = [int(digits) for digits in sys.argv[1:]] or [1000, 10000, 100000]
+    for digits in sizes:
+        random.seed(digits)
+        M = random.randrange(10 ** (digits - 1), 10 ** digits)
+        F = random.randrange(10 ** (digits - 1), 10 ** digits)
+
+        slow, slowTime = timed(generations, M, F)
+        fast, fastTime = timed(halfGcdGenerations, M, F)
+        assert slow == fast
+        print('%7d digits  solution %9.4fs  halfGcd %9.4fs  (%.1fx)' %
+              (digits, slowTime, fastTime, slowTime / fastTime))
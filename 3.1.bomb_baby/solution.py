@@ -1,4 +1,7 @@
-@profile
+from bisect import bisect_right
+from multiprocessing import Pool
+
+
 def solution(M, F):
 
     # Strategy:
@@ -6,8 +9,8 @@ def solution(M, F):
     # - try to apply as many steps on one rule as possible (this works very well
     #   when numbers are apart)
 
-    mach = long(M)
-    facula = long(F)
+    mach = int(M)
+    facula = int(F)
 
     # no replication yet
     generation = 0
@@ -20,10 +23,10 @@ def solution(M, F):
     while mach > 1 and facula > 1:
         # If one is grater that the other we can conclude which rule was applied
         if mach > facula:
-            generation += (mach / facula)
+            generation += (mach // facula)
             mach = mach % facula
         else:
-            generation += (facula / mach)
+            generation += (facula // mach)
             facula = facula % mach
 
 
@@ -41,3 +44,298 @@ def solution(M, F):
         return str(generation + mach - 1)
 
     return "impossible"
+
+
+# Batch mode -------------------------------------------------------------------
+#
+# Running Euclid's algorithm all the way (until the remainder is 0) adds one
+# extra step compared to stopping at 1, so for the same pair:
+#   generations = (sum of quotients) - 1,   possible only if gcd(M, F) == 1
+# This has no special cases, so all pairs can go through the loop together.
+
+# Pairs bigger than this go through the scalar path
+MAX_INT64 = 2**63 - 1
+
+# Amount of big pairs that makes a process pool worth its start up
+POOL_THRESHOLD = 10000
+
+
+def solutionPair(pair):
+    """solution() for a single (M, F) pair, used by the process pool"""
+    return solution(*pair)
+
+
+def vectorSolution(mach, facula):
+    """
+    solution() over two int64 NumPy arrays at once.
+    Returns an int64 array of generations, with -1 for impossible pairs.
+    """
+    import numpy as np
+
+    generation = np.zeros(len(mach), dtype=np.int64)
+    low = np.minimum(mach, facula)
+    high = np.maximum(mach, facula)
+
+    active = np.nonzero(low)[0]
+    while active.size:
+        l, h = low[active], high[active]
+        generation[active] += h // l
+        low[active], high[active] = h % l, l
+
+        # pairs with a 0 remainder are done
+        active = active[low[active] > 0]
+
+    # high ends up holding gcd(M, F)
+    return np.where(high == 1, generation - 1, -1)
+
+
+def solutionBatch(pairs, workers=None):
+    """
+    solution() for a list, array or stream of (M, F) pairs.
+    Returns a list with the number of generations (as strings) or "impossible"
+    for every pair, in order.
+
+    Pairs that fit in an int64 are solved together with NumPy, bigger ones with
+    solution(), spread across a process pool when there are many of them.
+    """
+    import numpy as np
+
+    pairs = [(int(M), int(F)) for M, F in pairs]
+    results = [None] * len(pairs)
+
+    small = [i for i, (M, F) in enumerate(pairs) if M <= MAX_INT64 and F <= MAX_INT64]
+    big = [i for i, (M, F) in enumerate(pairs) if M > MAX_INT64 or F > MAX_INT64]
+
+    if small:
+        values = np.array([pairs[i] for i in small], dtype=np.int64)
+        generations = vectorSolution(values[:, 0], values[:, 1])
+        for i, generation in zip(small, generations.tolist()):
+            results[i] = str(generation) if generation >= 0 else "impossible"
+
+    bigPairs = [pairs[i] for i in big]
+    if len(bigPairs) >= POOL_THRESHOLD and workers != 1:
+        with Pool(workers) as pool:
+            bigResults = pool.map(solutionPair, bigPairs, chunksize=1000)
+    else:
+        bigResults = [solutionPair(pair) for pair in bigPairs]
+
+    for i, result in zip(big, bigResults):
+        results[i] = result
+
+    return results
+
+
+# Half-GCD mode ----------------------------------------------------------------
+#
+# The reverse replication loop is Euclid's algorithm, so its quotients are the
+# continued fraction of M/F. A half-GCD recursion finds the first half of those
+# quotients from the high half of the bits only, as a 2x2 matrix:
+#   (a, b) = M (alpha, beta),  M = Q(q1) Q(q2) ... Q(qk),  Q(q) = [[q, 1], [1, 0]]
+# Working on truncated numbers can get the last quotients wrong. A prefix is
+# right exactly when alpha > beta >= 0 (the tail of the continued fraction is
+# then > 1), so wrong quotients are simply dropped from the end.
+# With Karatsuba products the whole thing is subquadratic.
+
+# Below this many bits plain Euclid is faster
+HGCD_THRESHOLD = 2048
+
+
+def reduceMatrix(a, b, M, quotients):
+    """
+    Apply M^-1 to (a, b), dropping trailing quotients until the prefix is a
+    valid one for (a, b). Returns the fixed M and (alpha, beta).
+    """
+    m11, m12, m21, m22 = M
+    det = -1 if len(quotients) % 2 else 1
+    alpha = det * (m22 * a - m12 * b)
+    beta = det * (m11 * b - m21 * a)
+
+    while not alpha > beta >= 0:
+        # M Q(q)^-1, and (alpha, beta) one step back
+        q = quotients.pop()
+        m11, m12, m21, m22 = m12, m11 - q * m12, m22, m21 - q * m22
+        alpha, beta = q * alpha + beta, alpha
+
+    return (m11, m12, m21, m22), alpha, beta
+
+
+def multiplyMatrix(A, B):
+    a11, a12, a21, a22 = A
+    b11, b12, b21, b22 = B
+    return (a11 * b11 + a12 * b21, a11 * b12 + a12 * b22,
+            a21 * b11 + a22 * b21, a21 * b12 + a22 * b22)
+
+
+def halfGcd(a, b):
+    """
+    For a > b > 0, find the Euclid quotients of (a, b) until the remainder has
+    about half the bits of a. Returns the matrix M (as a flat tuple) and the
+    list of quotients.
+    """
+    n = a.bit_length()
+    half = n // 2
+    M = (1, 0, 0, 1)
+    quotients = []
+
+    if n < HGCD_THRESHOLD:
+        m11, m12, m21, m22 = M
+        while b and b.bit_length() > half:
+            q, r = divmod(a, b)
+            a, b = b, r
+            m11, m12, m21, m22 = m11 * q + m12, m11, m21 * q + m22, m21
+            quotients.append(q)
+        return (m11, m12, m21, m22), quotients
+
+    # first half: from the top n/2 bits
+    if b >> half == 0:
+        return M, quotients
+    M, quotients = halfGcd(a >> half, b >> half)
+    M, a, b = reduceMatrix(a, b, M, quotients)
+
+    if b.bit_length() <= half:
+        return M, quotients
+
+    # one plain step in between
+    q, r = divmod(a, b)
+    a, b = b, r
+    M = multiplyMatrix(M, (q, 1, 1, 0))
+    quotients.append(q)
+
+    # second half: a has about 3n/4 bits now, bring b down to n/2 bits
+    shift = max(2 * half - a.bit_length(), 0)
+    if b.bit_length() <= half or b >> shift == 0:
+        return M, quotients
+    M2, quotients2 = halfGcd(a >> shift, b >> shift)
+    M2, a, b = reduceMatrix(a, b, M2, quotients2)
+
+    return multiplyMatrix(M, M2), quotients + quotients2
+
+
+def quotientSum(a, b):
+    """
+    Sum of all Euclid quotients of (a, b), running until the remainder is 0.
+    Returns the sum and gcd(a, b).
+    """
+    if a < b:
+        a, b = b, a
+
+    total = 0
+    while b:
+        if b.bit_length() >= HGCD_THRESHOLD:
+            M, quotients = halfGcd(a, b)
+            if quotients:
+                M, a, b = reduceMatrix(a, b, M, quotients)
+                total += sum(quotients)
+                continue
+
+        # small numbers, or no progress from the half-GCD
+        q, r = divmod(a, b)
+        total += q
+        a, b = b, r
+
+    return total, a
+
+
+def halfGcdGenerations(mach, facula):
+    """
+    Number of generations for two ints, or None when impossible.
+    Decimal conversions of huge ints are quadratic themselves, so this skips
+    them.
+    """
+    # See batch mode: generations are the quotient sum minus the last step
+    total, gcd = quotientSum(mach, facula)
+    if gcd != 1:
+        return None
+    return total - 1
+
+
+def halfGcdSolution(M, F):
+    """Same as solution(M, F), in subquadratic time for huge inputs"""
+    generation = halfGcdGenerations(int(M), int(F))
+    if generation is None:
+        return "impossible"
+    return str(generation)
+
+
+# Replication path -------------------------------------------------------------
+#
+# Each quotient of the reverse loop is a run of the same rule, so the path is
+# stored run-length encoded. Going forward, from (1, 1):
+#   MACH:   every Mach bomb creates a Facula bomb    (m, f) -> (m, f + m)
+#   FACULA: every Facula bomb creates a Mach bomb    (m, f) -> (m + f, f)
+
+MACH = 'M'
+FACULA = 'F'
+
+
+class ReplicationPath(object):
+    """
+    The fewest generations path from (1, 1) to (M, F), as (rule, repeat_count)
+    runs. Raises ValueError if (M, F) can't be reached.
+    """
+
+    def __init__(self, M, F):
+        mach = int(M)
+        facula = int(F)
+
+        # Reverse replication, same as solution(), keeping every run and the
+        # state it starts from (going forward)
+        runs = []
+        states = []
+        while mach > 1 and facula > 1:
+            if mach > facula:
+                count, remainder = divmod(mach, facula)
+                rule, mach = FACULA, remainder
+            else:
+                count, remainder = divmod(facula, mach)
+                rule, facula = MACH, remainder
+            runs.append((rule, count))
+            states.append((mach, facula))
+
+        if (mach, facula) != (1, 1):
+            if mach == 1:
+                runs.append((MACH, facula - 1))
+            elif facula == 1:
+                runs.append((FACULA, mach - 1))
+            else:
+                raise ValueError("impossible")
+            states.append((1, 1))
+
+        runs.reverse()
+        states.reverse()
+        self.runs = runs
+        self.states = states
+
+        # generations done before each run, and in total
+        self.starts = []
+        generations = 0
+        for _, count in runs:
+            self.starts.append(generations)
+            generations += count
+        self.generations = generations
+
+    def __iter__(self):
+        """The (rule, repeat_count) runs, from (1, 1) onwards"""
+        return iter(self.runs)
+
+    def stateAfter(self, k):
+        """(mach, facula) after k generations"""
+        if not 0 <= k <= self.generations:
+            raise IndexError('generation out of range')
+        if not self.runs:
+            return 1, 1
+
+        # last run starting at or before k
+        i = bisect_right(self.starts, k) - 1
+        rule, _ = self.runs[i]
+        mach, facula = self.states[i]
+        steps = k - self.starts[i]
+        if rule == MACH:
+            return mach, facula + steps * mach
+        return mach + steps * facula, facula
+
+
+def replicationSteps(M, F):
+    """Generator of the (rule, repeat_count) runs from (1, 1) to (M, F)"""
+    for run in ReplicationPath(M, F):
+        yield run
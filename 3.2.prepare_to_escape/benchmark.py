@@ -0,0 +1,144 @@
+"""
+solution() against the faster engines across grid sizes.
+
+Usage: python benchmark.py [largest side] [wall density]
+       python benchmark.py walls [side] [k]
+       python benchmark.py load [side]
+"""
+import random
+import sys
+import time
+
+from solution import solution, flatSolution, wavefrontSolution
+from solution import wallRemovalLengths, writeMazeFile, readMazeFile
+
+
+def maze(side, density=0.3):
+    """
+    Random side x side map with a wall density, solvable with at most one
+    wall removal: a random monotone path is carved from start to end, then
+    the middle row is walled off, so every engine does its full work.
+    """
+    random.seed(side)
+    map = [[1 if random.random() < density else 0 for x in range(side)]
+           for y in range(side)]
+
+    y = x = 0
+    map[0][0] = 0
+    while (y, x) != (side - 1, side - 1):
+        if x == side - 1 or (y < side - 1 and random.random() < 0.5):
+            y += 1
+        else:
+            x += 1
+        map[y][x] = 0
+
+    map[side // 2] = [1] * side
+
+    return map
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+SIDES = [20, 40, 80, 250, 500, 1000, 2000, 4000]
+
+# engine name, function, largest side worth trying
+ENGINES = [
+    ('solution', solution, 80),
+    ('flatSolution', flatSolution, 4000),
+    ('wavefrontSolution', wavefrontSolution, 4000),
+]
+
+
+def walls(side, k):
+    """Best lengths for every budget 0..k removed walls, on several densities"""
+    for density in (0.1, 0.3, 0.5):
+        lengths, elapsed = timed(wallRemovalLengths, maze(side, density), k)
+        print('density %.1f  %8.3fs  %s' % (density, elapsed, lengths))
+
+
+def loadOne(kind, filename):
+    """Load a map in this process, print load time and peak RSS"""
+    import json
+
+    import numpy   # loaded by both, so it doesn't count
+
+    start = time.perf_counter()
+    if kind == 'json':
+        with open(filename) as f:
+            map = json.load(f)
+    else:
+        map = readMazeFile(filename)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss survives the exec from the parent, VmHWM doesn't (kB, Linux)
+    with open('/proc/self/status') as f:
+        peak = [int(line.split()[1]) for line in f if line.startswith('VmHWM')][0]
+    print('%-5s %8.3fs  peak RSS %8.1f MB' % (kind, elapsed, peak / 1024.0))
+
+
+def load(side):
+    """Compare loading a JSON list of lists with loading a maze file"""
+    import json
+    import os
+    import subprocess
+    import tempfile
+
+    map = maze(side)
+    directory = tempfile.mkdtemp()
+    files = {
+        'json': os.path.join(directory, 'map.json'),
+        'maze': os.path.join(directory, 'map.maze'),
+    }
+    try:
+        with open(files['json'], 'w') as f:
+            json.dump(map, f)
+        writeMazeFile(map, files['maze'])
+        del map
+
+        for kind in ('json', 'maze'):
+            print('%-5s %8.1f MB on disk' % (kind, os.path.getsize(files[kind]) / 1e6))
+            subprocess.check_call([sys.executable, __file__, 'loadone', kind, files[kind]])
+    finally:
+        for filename in files.values():
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['loadone']:
+        loadOne(sys.argv[2], sys.argv[3])
+        sys.exit()
+
+    if sys.argv[1:2] == ['load']:
+        load(int(sys.argv[2]) if len(sys.argv) > 2 else 4000)
+        sys.exit()
+
+    if sys.argv[1:2] == ['walls']:
+        walls(int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+              int(sys.argv[3]) if len(sys.argv) > 3 else 10)
+        sys.exit()
+
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    # 0 gives open plans
+    density = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+
+    for side in SIDES:
+        if side > largest:
+            break
+        map = maze(side, density)
+        line = '%5d x %-5d' % (side, side)
+        expected = None
+        for name, function, limit in ENGINES:
+            if side > limit:
+                line += '  %s %9s' % (name, '-')
+                continue
+            result, elapsed = timed(function, map)
+            assert expected is None or result == expected
+            expected = result
+            line += '  %s %8.3fs' % (name, elapsed)
+        print(line)
@@ -1,3 +1,9 @@
+from array import array
+import mmap
+import struct
+from collections import deque, OrderedDict
+
+
 def solution(map):
 
     def getnextmove(position):
@@ -151,3 +157,415 @@ def solution(map):
     # remove None
     cleanSolutions = [count for count in solutions if count is not None]
     return min(cleanSolutions)
+
+
+# Flat grid engine -------------------------------------------------------------
+#
+# Same method as solution(), for maps of thousands by thousands of cells:
+# - the map is a flat bytearray with a border of walls around it, so a cell is
+#   an int index and its neighbors are index +-1 and index +-width, with no
+#   bounds checks,
+# - both BFS passes use a deque and write distances into int32 arrays,
+# - every wall is scored once with the distances of its neighbors.
+
+WALL = 1
+
+# Distance of the cells the BFS never reaches
+UNREACHED = -1
+
+
+def flattenMap(map):
+    """
+    Convert a list of lists map into (grid, width, height): a bytearray of
+    (height + 2) x (width + 2) cells, the map surrounded by walls.
+    """
+    h = len(map)
+    w = len(map[0])
+    width = w + 2
+
+    grid = bytearray([WALL]) * (width * (h + 2))
+    for y, row in enumerate(map):
+        start = (y + 1) * width + 1
+        grid[start:start + w] = bytes(bytearray(row))
+
+    return grid, width, h + 2
+
+
+def bfsDistances(grid, width, source):
+    """
+    Number of moves from source to every open cell of a flat grid, UNREACHED
+    for the rest.
+    """
+    distance = array('i', [UNREACHED]) * len(grid)
+    distance[source] = 0
+
+    queue = deque([source])
+    while queue:
+        cell = queue.popleft()
+        nextDistance = distance[cell] + 1
+        for neighbor in (cell + width, cell - width, cell - 1, cell + 1):
+            if distance[neighbor] == UNREACHED and grid[neighbor] != WALL:
+                distance[neighbor] = nextDistance
+                queue.append(neighbor)
+
+    return distance
+
+
+def bestWallRemoval(grid, width, distanceFromStart, distanceFromEnd):
+    """
+    Shortest path length (in nodes) going through one removed wall, None if no
+    wall joins both sides. The wall is joined from its closest neighbor to the
+    start and its closest neighbor to the end.
+    """
+    best = None
+    height = len(grid) // width
+
+    # the border walls are never removed
+    for y in range(1, height - 1):
+        row = y * width
+        for cell in range(row + 1, row + width - 1):
+            if grid[cell] != WALL:
+                continue
+
+            neighbors = (cell + width, cell - width, cell - 1, cell + 1)
+            d2s = [distanceFromStart[n] for n in neighbors if distanceFromStart[n] != UNREACHED]
+            if not d2s:
+                continue
+            d2e = [distanceFromEnd[n] for n in neighbors if distanceFromEnd[n] != UNREACHED]
+            if not d2e:
+                continue
+
+            length = min(d2s) + min(d2e) + 3
+            if best is None or length < best:
+                best = length
+
+    return best
+
+
+def flatSolution(map):
+    """Same as solution(map), using the flat grid engine"""
+    grid, width, height = flattenMap(map)
+    start = width + 1
+    end = len(grid) - width - 2
+
+    distanceFromStart = bfsDistances(grid, width, start)
+
+    # if there is a path, and it is the shortest one, return it
+    direct = None
+    if distanceFromStart[end] != UNREACHED:
+        direct = distanceFromStart[end] + 1
+        if direct == width + height - 5:
+            return direct
+
+    distanceFromEnd = bfsDistances(grid, width, end)
+    joined = bestWallRemoval(grid, width, distanceFromStart, distanceFromEnd)
+
+    # None only if the map can't be solved even removing a wall
+    solutions = [count for count in (direct, joined) if count is not None]
+    return min(solutions) if solutions else None
+
+
+# NumPy wavefront engine -------------------------------------------------------
+#
+# Both distance fields grow one whole BFS layer per iteration: the frontier is
+# an array of flat cell indexes, its neighbors are the frontier plus the four
+# index offsets, masked by walls and by the cells already reached. Every layer
+# costs NumPy work proportional to its size, so open plans (with huge layers)
+# gain the most. The wall scoring is a single array expression.
+
+def paddedGrid(map):
+    """The map as a 2D uint8 NumPy array surrounded by walls"""
+    import numpy as np
+
+    return np.pad(np.asarray(map, dtype=np.uint8), 1, constant_values=WALL)
+
+
+def wavefrontDistances(grid, source):
+    """
+    Number of moves from source (a flat index) to every open cell of a padded
+    2D grid, UNREACHED for the rest. Returns a 2D int32 array.
+    """
+    import numpy as np
+
+    width = grid.shape[1]
+    isOpen = grid.ravel() != WALL
+    distance = np.full(grid.size, UNREACHED, dtype=np.int32)
+    distance[source] = 0
+
+    offsets = np.array([width, -width, -1, 1], dtype=np.intp)
+    # scratch space to drop repeated cells of a layer
+    owner = np.empty(grid.size, dtype=np.intp)
+
+    frontier = np.array([source], dtype=np.intp)
+    layer = 0
+    while frontier.size:
+        layer += 1
+        cells = (frontier[:, None] + offsets).ravel()
+        cells = cells[isOpen[cells] & (distance[cells] == UNREACHED)]
+
+        # the last write wins: keep one copy of every cell
+        order = np.arange(cells.size)
+        owner[cells] = order
+        frontier = cells[owner[cells] == order]
+
+        distance[frontier] = layer
+
+    return distance.reshape(grid.shape)
+
+
+def wavefrontWallRemoval(grid, distanceFromStart, distanceFromEnd):
+    """
+    Vectorized bestWallRemoval over padded 2D arrays: for every inner wall, the
+    closest open neighbor to the start plus the closest one to the end.
+    """
+    import numpy as np
+
+    def closestNeighbor(distance):
+        """Minimum distance among the 4 neighbors of every inner cell"""
+        far = np.iinfo(np.int64).max // 4
+        d = np.where(distance == UNREACHED, far, distance.astype(np.int64))
+        return np.minimum(np.minimum(d[2:, 1:-1], d[:-2, 1:-1]),
+                          np.minimum(d[1:-1, :-2], d[1:-1, 2:])), far
+
+    d2s, far = closestNeighbor(distanceFromStart)
+    d2e, _ = closestNeighbor(distanceFromEnd)
+
+    walls = (grid[1:-1, 1:-1] == WALL) & (d2s < far) & (d2e < far)
+    if not walls.any():
+        return None
+
+    return int((d2s[walls] + d2e[walls]).min()) + 3
+
+
+def wavefrontSolution(map):
+    """Same as solution(map), using the NumPy wavefront engine"""
+    grid = paddedGrid(map)
+    height, width = grid.shape
+    start = width + 1
+    end = grid.size - width - 2
+
+    distanceFromStart = wavefrontDistances(grid, start)
+
+    # if there is a path, and it is the shortest one, return it
+    direct = None
+    if distanceFromStart.flat[end] != UNREACHED:
+        direct = int(distanceFromStart.flat[end]) + 1
+        if direct == width + height - 5:
+            return direct
+
+    distanceFromEnd = wavefrontDistances(grid, end)
+    joined = wavefrontWallRemoval(grid, distanceFromStart, distanceFromEnd)
+
+    # None only if the map can't be solved even removing a wall
+    solutions = [count for count in (direct, joined) if count is not None]
+    return min(solutions) if solutions else None
+
+
+# k wall removal ---------------------------------------------------------------
+#
+# BFS over (cell, walls removed) states, one layer per iteration like the
+# wavefront engine. Stepping into a wall removes it, so it uses one more wall.
+# BFS reaches states in distance order, so a state is only worth keeping if
+# its cell was never reached with as few walls before: the per cell minimum of
+# walls used is all the state there is to store.
+
+def wallRemovalLengths(map, k):
+    """
+    Shortest path length (in nodes) from the top left to the bottom right,
+    removing at most b walls, for every budget b in 0..k. None where there is
+    no path.
+    """
+    import numpy as np
+
+    grid = paddedGrid(map)
+    width = grid.shape[1]
+    start = width + 1
+    end = grid.size - width - 2
+
+    # border walls are never removed
+    isBorder = np.zeros(grid.shape, dtype=bool)
+    isBorder[[0, -1], :] = True
+    isBorder[:, [0, -1]] = True
+    isBorder = isBorder.ravel()
+    isWall = grid.ravel() == WALL
+
+    fewestWalls = np.full(grid.size, k + 1, dtype=np.int16)
+    fewestWalls[start] = 0
+
+    offsets = np.array([width, -width, -1, 1], dtype=np.intp)
+    owner = np.empty(grid.size, dtype=np.intp)
+
+    lengths = [None] * (k + 1)
+    cells = np.array([start], dtype=np.intp)
+    used = np.array([0], dtype=np.int16)
+    distance = 0
+    while cells.size:
+        # record the end, every budget from here on is settled by this length
+        if fewestWalls[end] < k + 1 and lengths[fewestWalls[end]] is None:
+            for budget in range(fewestWalls[end], k + 1):
+                if lengths[budget] is None:
+                    lengths[budget] = distance + 1
+            if fewestWalls[end] == 0:
+                break
+
+        distance += 1
+        nextCells = (cells[:, None] + offsets).ravel()
+        nextUsed = np.repeat(used, 4) + isWall[nextCells]
+
+        keep = ~isBorder[nextCells] & (nextUsed < fewestWalls[nextCells])
+        nextCells, nextUsed = nextCells[keep], nextUsed[keep]
+
+        # the fewest walls for each cell of the layer, then one state per cell
+        np.minimum.at(fewestWalls, nextCells, nextUsed)
+        keep = nextUsed == fewestWalls[nextCells]
+        nextCells, nextUsed = nextCells[keep], nextUsed[keep]
+
+        order = np.arange(nextCells.size)
+        owner[nextCells] = order
+        keep = owner[nextCells] == order
+        cells, used = nextCells[keep], nextUsed[keep]
+
+    return lengths
+
+
+def kWallSolution(map, k):
+    """Shortest path length removing at most k walls (k = 1 is solution())"""
+    return wallRemovalLengths(map, k)[k]
+
+
+# Multi-query mode -------------------------------------------------------------
+#
+# For many start/end questions on the same map. The distance field of every
+# endpoint is a BFS over the whole map, so they are kept in an LRU cache, and
+# batches compute the field of each start only once.
+
+class Maze(object):
+    """
+    A map prepared once for many shortest path queries. Cells are (y, x)
+    pairs, as in the list of lists map.
+    """
+
+    def __init__(self, map, cacheSize=16):
+        self.grid = paddedGrid(map)
+        self.height = len(map)
+        self.width = len(map[0])
+        self.cacheSize = cacheSize
+        self.cache = OrderedDict()
+
+    def index(self, cell):
+        """Flat index of a (y, x) cell in the padded grid"""
+        y, x = cell
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            raise IndexError('cell out of the map: %r' % (cell,))
+        if self.grid[y + 1, x + 1] == WALL:
+            raise ValueError('cell is a wall: %r' % (cell,))
+        return (y + 1) * self.grid.shape[1] + x + 1
+
+    def distanceField(self, cell):
+        """Distances from cell to the whole map, through the LRU cache"""
+        source = self.index(cell)
+        if source in self.cache:
+            self.cache.move_to_end(source)
+            return self.cache[source]
+
+        distance = wavefrontDistances(self.grid, source)
+        self.cache[source] = distance
+        if len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+        return distance
+
+    def pathLength(self, start, end, removeWall=True, fields=None):
+        """
+        Shortest path length (in nodes) from start to end, allowing the removal
+        of one wall or none. None if there is no such path.
+        fields can map cells to distance fields computed already.
+        """
+        start, end = tuple(start), tuple(end)
+        fields = fields or {}
+        fromStart = fields.get(start)
+        if fromStart is None:
+            fromStart = self.distanceField(start)
+
+        direct = None
+        d = fromStart.flat[self.index(end)]
+        if d != UNREACHED:
+            direct = int(d) + 1
+            # as short as it can get
+            if direct == abs(start[0] - end[0]) + abs(start[1] - end[1]) + 1:
+                return direct
+        if not removeWall:
+            return direct
+
+        fromEnd = fields.get(end)
+        if fromEnd is None:
+            fromEnd = self.distanceField(end)
+        joined = wavefrontWallRemoval(self.grid, fromStart, fromEnd)
+
+        solutions = [count for count in (direct, joined) if count is not None]
+        return min(solutions) if solutions else None
+
+    def pathLengths(self, queries, removeWall=True):
+        """
+        pathLength for a batch of (start, end) queries. Queries sharing a start
+        are answered together with its field held once; end fields are only
+        computed when needed, through the LRU cache, so the batch never holds
+        more than the cache and one field.
+        """
+        queries = [(tuple(start), tuple(end)) for start, end in queries]
+
+        # group queries sharing a start
+        order = sorted(range(len(queries)), key=lambda i: queries[i])
+
+        lengths = [None] * len(queries)
+        fields = {}
+        for i in order:
+            start, end = queries[i]
+            if start not in fields:
+                fields = {start: self.distanceField(start)}
+            lengths[i] = self.pathLength(start, end, removeWall, fields)
+
+        return lengths
+
+
+# Maze file format -------------------------------------------------------------
+#
+# A header (magic, width, height as little endian uint32) followed by one bit
+# per cell, row by row, the first cell on the highest bit of the first byte.
+# The reader maps the file and unpacks the bits straight into a 2D uint8 array
+# that every engine above takes as a map.
+
+MAZE_MAGIC = b'MAZE'
+MAZE_HEADER = struct.Struct('<4sII')
+
+
+def writeMazeFile(map, filename):
+    """Save a list of lists (or 2D array) map as a bit packed maze file"""
+    import numpy as np
+
+    cells = np.asarray(map, dtype=np.uint8)
+    height, width = cells.shape
+    with open(filename, 'wb') as f:
+        f.write(MAZE_HEADER.pack(MAZE_MAGIC, width, height))
+        f.write(np.packbits(cells.ravel() != 0).tobytes())
+
+
+def readMazeFile(filename):
+    """Load a maze file as a 2D uint8 NumPy array of 0s and 1s"""
+    import numpy as np
+
+    with open(filename, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            magic, width, height = MAZE_HEADER.unpack_from(m)
+            if magic != MAZE_MAGIC:
+                raise ValueError('not a maze file: %s' % filename)
+            # unpackbits would pad a short file with open cells
+            if len(m) - MAZE_HEADER.size < (width * height + 7) // 8:
+                raise ValueError('truncated maze file: %s' % filename)
+
+            packed = np.frombuffer(m, dtype=np.uint8, offset=MAZE_HEADER.size)
+            cells = np.unpackbits(packed, count=width * height)
+
+            # the array must not keep the mmap alive
+            del packed
+
+    return cells.reshape(height, width)
@@ -0,0 +1,75 @@
+"""
+Time and peak memory (tracemalloc) of the lucky triple counters.
+
+Usage: python benchmark.py [n ...]     (default: 500 1000 2000)
+       python benchmark.py blocked [n ...]     (default: 2000 20000)
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+# blockedSolution imports numpy lazily: load it before timing anything
+import numpy
+
+from solution import solution, linearMemorySolution, sieveSolution
+from solution import blockedSolution
+
+
+def sample(n, maxValue=999999):
+    """Random list with plenty of small values, so there are triples"""
+    random.seed(n)
+    return [random.choice((random.randint(1, 100), random.randint(1, maxValue)))
+            for _ in range(n)]
+
+
+def measured(function, *args):
+    """Result, seconds and peak MB allocated while running function"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+# counter name, function, largest n worth trying
+COUNTERS = [
+    ('solution', solution, 2000),
+    ('linearMemorySolution', linearMemorySolution, 20000),
+    ('sieveSolution', sieveSolution, 10 ** 7),
+    ('blockedSolution', blockedSolution, 50000),
+]
+
+
+def blocked(sizes):
+    """Nested loop against the blocked kernel, for several block sizes"""
+    for n in sizes:
+        l = sample(n)
+        if n <= 2000:
+            _, elapsed, peak = measured(solution, l)
+            print('n=%-7d %-22s %9.3fs %10.2f MB' % (n, 'solution', elapsed, peak))
+        for blockSize in (128, 256, 1024, 4096):
+            _, elapsed, peak = measured(blockedSolution, l, blockSize)
+            print('n=%-7d %-22s %9.3fs %10.2f MB' %
+                  (n, 'blocked %d' % blockSize, elapsed, peak))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['blocked']:
+        blocked([int(n) for n in sys.argv[2:]] or [2000, 20000])
+        sys.exit()
+
+    sizes = [int(n) for n in sys.argv[1:]] or [500, 1000, 2000]
+    for n in sizes:
+        l = sample(n)
+        expected = None
+        for name, function, limit in COUNTERS:
+            if n > limit:
+                continue
+            result, elapsed, peak = measured(function, l)
+            assert expected is None or result == expected
+            expected = result
+            print('n=%-7d %-22s %9.3fs %10.2f MB  (%d triples)' %
+                  (n, name, elapsed, peak, result))
@@ -1,3 +1,6 @@
+from itertools import islice
+
+
 def solution(l):
     """
     Returns the number of "lucky triples": (x, y, z) or (l[i], l[j], l[k]),
@@ -65,3 +68,276 @@ def solution(l):
             counter += len(z_list)
 
     return counter
+
+
+def linearMemorySolution(l):
+    """
+    Same count as solution(l) with O(n) memory: neither modm nor modl.
+
+    Every lucky triple has a middle element l[j], so the count is the sum over
+    j of (divisors of l[j] before j) * (multiples of l[j] after j).
+    """
+    divisorsBefore = [sum(1 for x in islice(l, j) if y % x == 0)
+                      for j, y in enumerate(l)]
+
+    counter = 0
+    for j, y in enumerate(l):
+        # no need to look for multiples of an element with no divisors before
+        if divisorsBefore[j]:
+            multiplesAfter = sum(1 for z in islice(l, j + 1, None) if z % y == 0)
+            counter += divisorsBefore[j] * multiplesAfter
+
+    return counter
+
+
+# Value-indexed engine ---------------------------------------------------------
+#
+# With bounded values, the pairwise % is not needed. Sweeping the list in
+# order and indexing counts by value:
+# - left to right, divisorsBefore[j] is the sum of the counts (so far) of every
+#   divisor of l[j],
+# - right to left, every element adds 1 to each of its divisors, so the
+#   multiples after l[j] are simply the count stored at l[j].
+# Divisors come from a smallest prime factor sieve, so the cost is
+# O(max(l) + n * divisors) instead of O(n^2).
+
+def smallestPrimeFactors(limit):
+    """spf[v] is the smallest prime factor of v, for 2 <= v <= limit"""
+    spf = list(range(limit + 1))
+    # largest primes first, so the smallest one is the last write
+    primes = [p for p in range(2, int(limit ** 0.5) + 1)
+              if all(p % q for q in range(2, int(p ** 0.5) + 1))]
+    for p in reversed(primes):
+        spf[p * p::p] = [p] * len(range(p * p, limit + 1, p))
+    return spf
+
+
+def divisors(v, spf):
+    """All the divisors of v"""
+    result = [1]
+    while v > 1:
+        p = spf[v]
+        power = 0
+        while v % p == 0:
+            v //= p
+            power += 1
+        result = [d * p ** e for d in result for e in range(power + 1)]
+    return result
+
+
+def sieveSolution(l):
+    """Same count as solution(l), for bounded positive values"""
+    if not l:
+        return 0
+
+    maxValue = max(l)
+    spf = smallestPrimeFactors(maxValue)
+    divisorLists = {}
+    for v in set(l):
+        divisorLists[v] = divisors(v, spf)
+
+    # divisors before every index
+    counts = [0] * (maxValue + 1)
+    divisorsBefore = []
+    for y in l:
+        divisorsBefore.append(sum(counts[d] for d in divisorLists[y]))
+        counts[y] += 1
+
+    # multiples after every index, weighted by the divisors before it
+    counter = 0
+    multiples = [0] * (maxValue + 1)
+    for j in range(len(l) - 1, -1, -1):
+        y = l[j]
+        counter += divisorsBefore[j] * multiples[y]
+        for d in divisorLists[y]:
+            multiples[d] += 1
+
+    return counter
+
+
+# Blocked NumPy engine --------------------------------------------------------
+#
+# The pairwise relation, computed one tile of rows x columns at a time as a
+# broadcast l[j] % l[i] == 0. Only tiles on or above the diagonal are needed,
+# and the diagonal ones are masked to j > i. Each tile adds its row sums to
+# multiplesAfter and its column sums to divisorsBefore, then the triples are
+# one product of the two vectors. Memory is one tile, blockSize^2 booleans.
+
+def blockedSolution(l, blockSize=256):
+    """Same count as solution(l), with the divisibility computed in tiles"""
+    import numpy as np
+
+    values = np.asarray(l, dtype=np.int64)
+    n = values.size
+    divisorsBefore = np.zeros(n, dtype=np.int64)
+    multiplesAfter = np.zeros(n, dtype=np.int64)
+
+    for rowStart in range(0, n, blockSize):
+        rows = values[rowStart:rowStart + blockSize]
+        for colStart in range(rowStart, n, blockSize):
+            cols = values[colStart:colStart + blockSize]
+            divides = cols[None, :] % rows[:, None] == 0
+
+            if colStart == rowStart:
+                # diagonal tile: only j > i
+                divides &= np.triu(np.ones(divides.shape, dtype=bool), 1)
+
+            multiplesAfter[rowStart:rowStart + rows.size] += divides.sum(axis=1)
+            divisorsBefore[colStart:colStart + cols.size] += divides.sum(axis=0)
+
+    return int(divisorsBefore @ multiplesAfter)
+
+
+# Divisor chains ---------------------------------------------------------------
+#
+# A lucky triple is a divisor chain of length 3: indexes i1 < i2 < ... < ik with
+# each value dividing the next one. For any length, a chain is a shorter chain
+# plus one multiple after its last index, so (as with modl, without storing it)
+#   ending[t][j] = sum of ending[t-1][i] for i < j with l[i] | l[j]
+# The counts grow very fast, so the chains themselves are streamed.
+
+def chainCounts(l, k):
+    """
+    Number of divisor chains of every length 1..k, as a list (the count for
+    length t at position t - 1). chainCounts(l, 3)[2] == solution(l).
+    """
+    if k < 1:
+        return []
+
+    # ending[j][t - 1]: chains of length t ending at j
+    ending = []
+    for j, y in enumerate(l):
+        counts = [1] + [0] * (k - 1)
+        for i in range(j):
+            if y % l[i] == 0:
+                before = ending[i]
+                for t in range(1, k):
+                    counts[t] += before[t - 1]
+        ending.append(counts)
+
+    return [sum(counts[t] for counts in ending) for t in range(k)]
+
+
+def multiplesAfter(l, i):
+    """Generator of the indexes j > i with l[i] | l[j]"""
+    x = l[i]
+    for j in range(i + 1, len(l)):
+        if l[j] % x == 0:
+            yield j
+
+
+def chainsStarting(l, k):
+    """
+    starting[i][t - 1]: number of divisor chains of length t (1..k) starting
+    at index i. The mirror image of the counts in chainCounts.
+    """
+    n = len(l)
+    starting = [None] * n
+    for i in range(n - 1, -1, -1):
+        counts = [1] + [0] * (k - 1)
+        for j in multiplesAfter(l, i):
+            after = starting[j]
+            for t in range(1, k):
+                counts[t] += after[t - 1]
+        starting[i] = counts
+    return starting
+
+
+def chains(l, k, limit=None):
+    """
+    Generator of the divisor chains of length k, as tuples of indexes, in
+    lexicographic order. Only the current chain is held in memory. Stops after
+    limit chains if given.
+    """
+    if k < 1 or (limit is not None and limit <= 0):
+        return
+
+    # only extend prefixes that still have a chain of length k to complete
+    starting = chainsStarting(l, k)
+
+    def candidates(i, length):
+        """Multiples after i starting a chain of the given length"""
+        for j in multiplesAfter(l, i):
+            if starting[j][length - 1]:
+                yield j
+
+    found = 0
+    for start in range(len(l)):
+        if not starting[start][k - 1]:
+            continue
+        if k == 1:
+            yield (start,)
+            found += 1
+            if found == limit:
+                return
+            continue
+
+        # one generator of candidates for each position after the first
+        chain = [start]
+        stack = [candidates(start, k - 1)]
+        while stack:
+            j = next(stack[-1], None)
+            if j is None:
+                stack.pop()
+                chain.pop()
+                continue
+
+            if len(chain) + 1 == k:
+                yield tuple(chain) + (j,)
+                found += 1
+                if found == limit:
+                    return
+            else:
+                chain.append(j)
+                stack.append(candidates(j, k - len(chain)))
+
+
+def sampleChains(l, k, samples, rng=None):
+    """
+    Generator of divisor chains of length k (as many as samples), drawn
+    uniformly at random with replacement, without enumerating them all.
+    """
+    import random
+
+    rng = rng or random.Random()
+    if k < 1 or samples <= 0:
+        return
+
+    n = len(l)
+    starting = chainsStarting(l, k)
+
+    def pick(candidates, length):
+        """An index among candidates, weighted by its chains of length"""
+        candidates = list(candidates)
+        weights = [starting[c][length - 1] for c in candidates]
+        target = rng.randrange(sum(weights))
+        for candidate, weight in zip(candidates, weights):
+            if target < weight:
+                return candidate
+            target -= weight
+
+    if not any(starting[i][k - 1] for i in range(n)):
+        return
+
+    for _ in range(samples):
+        chain = [pick(range(n), k)]
+        for length in range(k - 1, 0, -1):
+            chain.append(pick(multiplesAfter(l, chain[-1]), length))
+        yield tuple(chain)
+
+
+# Rough costs, in units of one pair of a blocked tile: sieving one value, and
+# handling the divisors of one element
+VALUE_COST = 15
+ELEMENT_COST = 600
+
+
+def fastSolution(l):
+    """solution(l), with the engine that suits the size and range of l"""
+    n = len(l)
+    pairwiseCost = n * (n - 1) / 2.0
+    sieveCost = VALUE_COST * max(l or [0]) + ELEMENT_COST * n
+
+    if sieveCost < pairwiseCost:
+        return sieveSolution(l)
+    return blockedSolution(l)
@@ -0,0 +1,42 @@
+"""
+Time and peak memory (tracemalloc) of the key distribution builders.
+
+Usage: python benchmark.py
+"""
+import time
+import tracemalloc
+
+from solution import solution, streamedSolution, binomial
+
+
+def measured(function, *args):
+    """Result, seconds and peak MB allocated while running function"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+# (num_buns, num_required): mid-range num_required up to where the output
+# itself gets too big, then a few locks for many bunnies
+CASES = [(10, 5), (14, 7), (18, 9), (20, 10), (22, 11),
+         (26, 4), (30, 4), (30, 5)]
+
+# solution() is only run while its bit matrix fits comfortably
+MATRIX_LIMIT = 10 ** 7
+
+
+if __name__ == '__main__':
+    for num_buns, num_required in CASES:
+        nlocks = binomial(num_buns, num_required - 1)
+        line = '%2d bunnies %2d required %9d locks' % (num_buns, num_required, nlocks)
+        for name, function in (('solution', solution), ('streamed', streamedSolution)):
+            if function is solution and num_buns * nlocks > MATRIX_LIMIT:
+                line += '  %s %20s' % (name, '-')
+                continue
+            _, elapsed, peak = measured(function, num_buns, num_required)
+            line += '  %s %7.2fs %8.1f MB' % (name, elapsed, peak)
+        print(line)
@@ -1,4 +1,6 @@
-from math import factorial
+from functools import partial
+from itertools import combinations
+from multiprocessing import Pool
 
 def solution(num_buns, num_required):
     """
@@ -41,8 +43,7 @@ def solution(num_buns, num_required):
         Math choose function, aka nCk.
         Counts the ways you can choose k elements from a set of n
         """
-        f = factorial
-        return int(f(n) / (f(k) * f(n-k)))
+        return binomial(n, k)
 
 
     def lexCombs(n, t):
@@ -166,3 +167,249 @@ def solution(num_buns, num_required):
     output = bitToKeys(bitString)
 
     return output
+
+
+# Streamed distribution --------------------------------------------------------
+#
+# lexCombs fills the bit matrix with the (num_buns - num_required + 1)-subsets
+# of the bunnies in lexicographic order, one per lock. So lock j simply goes to
+# the bunnies of the j-th subset, and itertools.combinations yields them in
+# that order: every key can be appended straight to its bunnies' lists, which
+# come out sorted with no matrix in between.
+
+def binomial(n, k):
+    """Exact nCk with integers only, 0 outside 0 <= k <= n"""
+    if not 0 <= k <= n:
+        return 0
+    k = min(k, n - k)
+    result = 1
+    for i in range(1, k + 1):
+        # stays exact: result is now C(n - k + i, i)
+        result = result * (n - k + i) // i
+    return result
+
+
+def streamedSolution(num_buns, num_required):
+    """Same distribution as solution(), built without the bit matrix"""
+    keys = [[] for _ in range(num_buns)]
+
+    # Illogical edge cases: no locks at all
+    if num_required < 1 or num_required > num_buns:
+        return keys
+
+    copiesPerKey = num_buns - num_required + 1
+    for lock, bunnies in enumerate(combinations(range(num_buns), copiesPerKey)):
+        for bunny in bunnies:
+            keys[bunny].append(lock)
+
+    return keys
+
+
+# Random access ----------------------------------------------------------------
+#
+# Lock j belongs to the j-th (num_buns - num_required + 1)-subset of bunnies in
+# lexicographic order, so locks and subsets convert into each other with the
+# combinatorial number system. A bunny's keys are the ranks of the subsets that
+# contain it, found without generating the rest.
+
+def pascal(n):
+    """Table of binomials: table[a][b] = C(a, b) for 0 <= b <= a <= n"""
+    table = [[1]]
+    for a in range(1, n + 1):
+        previous = table[-1]
+        table.append([1] + [previous[b - 1] + previous[b] for b in range(1, a)] + [1])
+    return table
+
+
+def binomialFrom(table, a, b):
+    """C(a, b) from a pascal() table, 0 outside 0 <= b <= a"""
+    if not 0 <= b <= a:
+        return 0
+    return table[a][b]
+
+
+def lockNumber(num_buns, bunnies, table=None):
+    """
+    Lexicographic rank of a sorted subset of bunnies among the subsets of its
+    size: the lock those bunnies hold.
+    """
+    table = table or pascal(num_buns)
+    t = len(bunnies)
+
+    # subsets after this one are counted by the complement trick
+    after = sum(binomialFrom(table, num_buns - 1 - bunny, t - p)
+                for p, bunny in enumerate(bunnies))
+    return binomialFrom(table, num_buns, t) - 1 - after
+
+
+def lockBunnies(num_buns, num_required, lock):
+    """The sorted bunnies holding the keys of a lock (inverse of lockNumber)"""
+    t = num_buns - num_required + 1
+    if not 0 <= lock < binomial(num_buns, t) or num_required < 1:
+        raise IndexError('lock out of range')
+
+    bunnies = []
+    bunny = 0
+    for remaining in range(t, 0, -1):
+        # skip every block of subsets starting with a smaller bunny
+        while True:
+            block = binomial(num_buns - 1 - bunny, remaining - 1)
+            if lock < block:
+                break
+            lock -= block
+            bunny += 1
+        bunnies.append(bunny)
+        bunny += 1
+
+    return bunnies
+
+
+def bunnyKeys(num_buns, num_required, bunny):
+    """The sorted keys of one bunny, same as solution(...)[bunny]"""
+    if not 0 <= bunny < num_buns:
+        raise IndexError('bunny out of range')
+    if num_required < 1 or num_required > num_buns:
+        return []
+
+    table = pascal(num_buns)
+    keys = []
+
+    def walk(first, size, lock):
+        """
+        Keys among the subsets of `size` bunnies from first onwards, whose
+        ranks start at lock. They come in blocks by their smallest bunny.
+        """
+        for smallest in range(first, min(bunny, num_buns - size) + 1):
+            block = binomialFrom(table, num_buns - 1 - smallest, size - 1)
+            if smallest == bunny:
+                # the whole block contains the bunny
+                keys.extend(range(lock, lock + block))
+            elif size > 1:
+                walk(smallest + 1, size - 1, lock)
+            lock += block
+
+    walk(0, num_buns - num_required + 1, 0)
+    return keys
+
+
+def shardedSolution(num_buns, num_required, workers=None):
+    """solution() with every bunny's keys computed by a pool of processes"""
+    with Pool(workers) as pool:
+        return pool.map(partial(bunnyKeys, num_buns, num_required), range(num_buns))
+
+
+# Verifier ---------------------------------------------------------------------
+#
+# Every bunny's keys become an int bitmask, so the locks a group can open are
+# the OR of its masks. Groups are enumerated in lexicographic order with a
+# stack of prefix ORs: each new group costs a single OR. Groups are split by
+# their first two bunnies, and the parts are checked by a pool of processes.
+
+# bitmasks of the distribution under check, set once per worker
+verifierMasks = []
+
+
+def keyMasks(keys):
+    """One int bitmask of keys per bunny"""
+    masks = []
+    for bunnyKeys in keys:
+        mask = 0
+        for key in bunnyKeys:
+            mask |= 1 << key
+        masks.append(mask)
+    return masks
+
+
+def setVerifierMasks(masks):
+    """Pool initializer: every worker gets the masks once"""
+    global verifierMasks
+    verifierMasks = masks
+
+
+def findGroup(task):
+    """
+    First group of `size` bunnies starting with prefix whose keys open all the
+    locks (opens=True), or do not (opens=False). None if there is none.
+    """
+    prefix, size, full, opens = task
+    masks = verifierMasks
+    n = len(masks)
+
+    mask = 0
+    for bunny in prefix:
+        mask |= masks[bunny]
+    if len(prefix) == size:
+        return tuple(prefix) if (mask == full) == opens else None
+
+    # depth first, with the OR of the group so far at every level
+    group = list(prefix)
+    ors = [mask]
+    candidates = [prefix[-1] + 1 if prefix else 0]
+    while candidates:
+        bunny = candidates[-1]
+        # not enough bunnies left to fill the group
+        if bunny > n - (size - len(group)):
+            candidates.pop()
+            ors.pop()
+            if group[len(prefix):]:
+                group.pop()
+            continue
+        candidates[-1] += 1
+
+        mask = ors[-1] | masks[bunny]
+        if len(group) + 1 == size:
+            if (mask == full) == opens:
+                return tuple(group) + (bunny,)
+        else:
+            group.append(bunny)
+            ors.append(mask)
+            candidates.append(bunny + 1)
+
+    return None
+
+
+def verifyDistribution(keys, num_required, workers=None, locks=None):
+    """
+    Check a key distribution: every group of num_required bunnies must open
+    all the locks, and no group of num_required - 1 bunnies may.
+
+    locks defaults to the C(n, num_required - 1) locks of solution(), or more
+    if some key is beyond them. Returns None if it is right, or the first
+    counterexample found as (group of bunnies, whether they open all the locks).
+    """
+    masks = keyMasks(keys)
+    n = len(masks)
+    if locks is None:
+        locks = binomial(n, num_required - 1)
+        for mask in masks:
+            locks = max(locks, mask.bit_length())
+    full = (1 << locks) - 1
+
+    checks = [(num_required, False)]
+    if num_required >= 1:
+        checks.append((num_required - 1, True))
+
+    tasks = []
+    for size, opens in checks:
+        if not 0 <= size <= n:
+            continue
+        depth = min(size, 2)
+        for prefix in combinations(range(n), depth):
+            tasks.append((prefix, size, full, opens))
+
+    if workers == 1:
+        setVerifierMasks(masks)
+        for task in tasks:
+            group = findGroup(task)
+            if group is not None:
+                return group, task[3]
+        return None
+
+    with Pool(workers, initializer=setVerifierMasks, initargs=(masks,)) as pool:
+        # results in completion order: any counterexample ends the search
+        for group in pool.imap_unordered(findGroup, tasks):
+            if group is not None:
+                # leaving the block terminates the other workers
+                return group, len(group) != num_required
+
+    return None
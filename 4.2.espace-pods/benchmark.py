@@ -0,0 +1,116 @@
+"""
+solution() against the Dinic engine on dense and sparse buildings.
+
+Usage: python benchmark.py [incremental]
+"""
+import random
+import sys
+import time
+
+from solution import solution, dinicSolution, edgeListSolution
+from solution import writeEdgeFile, edgeFileSolution, FlowNetwork
+
+
+def denseBuilding(n, density=0.5):
+    """n rooms, most of them connected, entrances first and exits last"""
+    random.seed(n)
+    path = [[random.randint(1, 2000000) if random.random() < density and u != v else 0
+             for v in range(n)] for u in range(n)]
+    return list(range(n // 10 or 1)), list(range(n - (n // 10 or 1), n)), path
+
+
+def sparseEdges(n, degree=4):
+    """n rooms, each with corridors to a few nearby rooms and one far away"""
+    random.seed(n)
+    edges = []
+    for u in range(n):
+        for _ in range(degree - 1):
+            v = min(n - 1, max(0, u + random.randint(-50, 50)))
+            if v != u:
+                edges.append((u, v, random.randint(1, 1000)))
+        edges.append((u, random.randrange(n), random.randint(1, 1000)))
+    return edges
+
+
+def sparseBuilding(n):
+    """A sparse building as a capacity matrix, for solution()"""
+    path = [[0] * n for _ in range(n)]
+    for u, v, c in sparseEdges(n):
+        path[u][v] = c
+    return list(range(5)), list(range(n - 5, n)), path
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(name, building):
+    entrances, exits, path = building
+    slow, slowTime = timed(solution, entrances, exits, [row[:] for row in path])
+    fast, fastTime = timed(dinicSolution, entrances, exits, path)
+    assert slow == fast
+    print('%-14s solution %8.3fs  dinic %8.3fs' % (name, slowTime, fastTime))
+
+
+def sparseLarge(n):
+    """Dinic alone on a big sparse building, from a list and from a file"""
+    import os
+    import tempfile
+
+    edges = sparseEdges(n)
+    entrances, exits = list(range(5)), list(range(n - 5, n))
+    fromList, listTime = timed(edgeListSolution, entrances, exits, edges, n)
+
+    fd, filename = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        writeEdgeFile(edges, filename)
+        fromFile, fileTime = timed(edgeFileSolution, entrances, exits, filename, n)
+    finally:
+        os.remove(filename)
+
+    assert fromList == fromFile
+    print('%-14s edge list %7.3fs  edge file %7.3fs' % ('sparse %d' % n, listTime, fileTime))
+
+
+def incremental(n, batch):
+    """
+    A batch of random capacity changes on a sparse building, applied to a
+    FlowNetwork against solving the changed building from scratch.
+    """
+    edges = sparseEdges(n)
+    entrances, exits = list(range(5)), list(range(n - 5, n))
+    network = FlowNetwork(n, edges, entrances, exits)
+
+    random.seed(batch)
+    changes = [(random.randrange(len(edges)), random.randint(1, 1000)) for _ in range(batch)]
+    start = time.perf_counter()
+    for corridor, limit in changes:
+        warm = network.setCapacity(corridor, limit)
+    warmTime = time.perf_counter() - start
+
+    for corridor, limit in changes:
+        u, v, _ = edges[corridor]
+        edges[corridor] = (u, v, limit)
+    cold, coldTime = timed(edgeListSolution, entrances, exits, edges, n)
+
+    assert warm == cold
+    print('%-14s %3d changes  cold %7.3fs  warm %7.3fs  speedup %6.1fx'
+          % ('sparse %d' % n, batch, coldTime, warmTime, coldTime / warmTime))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['incremental']:
+        for n in (10000, 100000):
+            for batch in (1, 10, 100):
+                incremental(n, batch)
+        sys.exit()
+
+    for n in (50, 100, 200):
+        compare('dense %d' % n, denseBuilding(n))
+    for n in (200, 500, 1000):
+        compare('sparse %d' % n, sparseBuilding(n))
+    for n in (10000, 100000):
+        sparseLarge(n)
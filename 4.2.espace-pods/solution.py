@@ -1,3 +1,7 @@
+import os
+from collections import deque
+
+
 def solution(entrances, exits, path):
     """
     Maximizes the number of bunnies that can get out to the escape pods at each
@@ -46,8 +50,8 @@ def solution(entrances, exits, path):
                 spath[i+1][j+1] = path[i][j]
 
         # connect super source with entrances and set capacity
-        for i, _ in enumerate(entrances):
-            spath[0][i+1] = INFINITE
+        for i, e in enumerate(entrances):
+            spath[0][e+1] = INFINITE
 
         # connect exits with the super sink and set capacity
         for i, e in enumerate(exits):
@@ -123,3 +127,326 @@ def solution(entrances, exits, path):
             node = pnode
 
     return maxflow
+
+
+# Dinic engine -----------------------------------------------------------------
+#
+# For big sparse buildings. The residual graph is stored CSR style: the arcs
+# leaving room u are arcs start[u] to start[u + 1] - 1 of three flat arrays,
+# head (where the arc goes), capacity (residual) and reverse (the paired arc in
+# the other direction). Every corridor adds a forward arc with its capacity and
+# a reverse arc with none.
+#
+# Dinic's algorithm then alternates a BFS that levels the rooms by distance to
+# the source, and depth first searches that only follow arcs one level up,
+# skipping arcs (current arc pointers) and rooms (dead ends) already used up.
+
+def residualGraph(n, edges, forwardArcs=None):
+    """
+    Build the CSR residual graph of n rooms from (u, v, capacity) corridors.
+    Returns (start, head, capacity, reverse).
+    If forwardArcs is a list, the forward arc of every corridor is appended.
+    """
+    degree = [0] * (n + 1)
+    for u, v, _ in edges:
+        degree[u] += 1
+        degree[v] += 1
+
+    start = [0] * (n + 1)
+    for u in range(n):
+        start[u + 1] = start[u] + degree[u]
+
+    arcs = start[n]
+    head = [0] * arcs
+    capacity = [0] * arcs
+    reverse = [0] * arcs
+
+    position = start[:n]
+    for u, v, c in edges:
+        forward = position[u]
+        position[u] += 1
+        backward = position[v]
+        position[v] += 1
+
+        head[forward], capacity[forward], reverse[forward] = v, c, backward
+        head[backward], capacity[backward], reverse[backward] = u, 0, forward
+
+        if forwardArcs is not None:
+            forwardArcs.append(forward)
+
+    return start, head, capacity, reverse
+
+
+def dinic(graph, source, sink):
+    """Maximum flow from source to sink. Updates the residual capacities"""
+    return multiDinic(graph, [source], [sink])
+
+
+def multiDinic(graph, sources, sinks, limit=None):
+    """
+    Maximum flow from a set of sources to a set of sinks, as if a super source
+    fed every source and every sink drained into a super sink, both with
+    unlimited capacity. Those two stay virtual: the BFS starts from all the
+    sources at once and a path ends at any sink. Updates the residual
+    capacities. Stops once the flow reaches limit, if given.
+    """
+    start, head, capacity, reverse = graph
+    n = len(start) - 1
+    isSink = [False] * n
+    for t in sinks:
+        isSink[t] = True
+    if any(isSink[s] for s in sources):
+        raise ValueError('a room can not be both a source and a sink')
+
+    maxflow = 0
+    while limit is None or maxflow < limit:
+        # BFS levels over arcs with residual capacity
+        level = [-1] * n
+        for s in sources:
+            level[s] = 0
+        queue = deque(sources)
+        reached = False
+        while queue:
+            u = queue.popleft()
+            for arc in range(start[u], start[u + 1]):
+                v = head[arc]
+                if capacity[arc] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    reached = reached or isSink[v]
+                    queue.append(v)
+
+        if not reached:
+            return maxflow
+
+        # current arc of every room
+        current = start[:n]
+
+        # blocking flow, one augmenting path at a time, from every source
+        for source in sources:
+            path = []   # arcs from the source
+            u = source
+            while True:
+                if isSink[u]:
+                    # bottle neck, then update residual capacities
+                    cflow = min(capacity[arc] for arc in path)
+                    if limit is not None:
+                        cflow = min(cflow, limit - maxflow)
+                    for arc in path:
+                        capacity[arc] -= cflow
+                        capacity[reverse[arc]] += cflow
+                    maxflow += cflow
+                    if maxflow == limit:
+                        return maxflow
+
+                    # back to the first saturated arc
+                    for i, arc in enumerate(path):
+                        if capacity[arc] == 0:
+                            del path[i:]
+                            break
+                    u = head[path[-1]] if path else source
+                    continue
+
+                # advance to the next arc going one level up
+                end = start[u + 1]
+                arc = current[u]
+                while arc < end and (capacity[arc] == 0 or level[head[arc]] != level[u] + 1):
+                    arc += 1
+                current[u] = arc
+
+                if arc < end:
+                    path.append(arc)
+                    u = head[arc]
+                    continue
+
+                # dead end: never come back, retreat
+                level[u] = -1
+                if not path:
+                    break
+                path.pop()
+                u = head[path[-1]] if path else source
+
+
+def denseEdges(path):
+    """(u, v, capacity) corridors of a capacity matrix"""
+    return [(u, v, c) for u, row in enumerate(path) for v, c in enumerate(row) if c]
+
+
+def dinicSolution(entrances, exits, path):
+    """Same as solution(entrances, exits, path), with the Dinic engine"""
+    return edgeListSolution(entrances, exits, denseEdges(path), len(path))
+
+
+# Sparse input -----------------------------------------------------------------
+#
+# Buildings can also come as (u, v, capacity) corridor lists, or as binary
+# files of int64 triples. Files are memory mapped and the CSR graph is built
+# from the mapped columns with NumPy, so a building costs O(E) to set up.
+
+EDGE_DTYPE = [('u', '<i8'), ('v', '<i8'), ('capacity', '<i8')]
+
+
+def edgeListSolution(entrances, exits, edges, n=None):
+    """
+    Maximum flow for a building given as (u, v, capacity) corridors, with n
+    rooms (by default, one more than the highest room in use).
+    """
+    edges = list(edges)
+    if n is None:
+        n = 1 + max([max(u, v) for u, v, _ in edges] + list(entrances) + list(exits))
+    return multiDinic(residualGraph(n, edges), entrances, exits)
+
+
+def writeEdgeFile(edges, filename):
+    """Save (u, v, capacity) corridors as a binary edge file"""
+    import numpy as np
+
+    np.array([tuple(edge) for edge in edges], dtype=EDGE_DTYPE).tofile(filename)
+
+
+def readEdgeFile(filename):
+    """Memory map an edge file. Returns its (u, v, capacity) columns"""
+    import numpy as np
+
+    # an empty file can't be mapped
+    if os.path.getsize(filename) == 0:
+        records = np.zeros(0, dtype=EDGE_DTYPE)
+    else:
+        records = np.memmap(filename, dtype=EDGE_DTYPE, mode='r')
+    return records['u'], records['v'], records['capacity']
+
+
+def arrayResidualGraph(n, u, v, capacity):
+    """
+    residualGraph from NumPy columns of corridors, sorting the arcs by room
+    with NumPy instead of Python loops.
+    """
+    import numpy as np
+
+    m = len(u)
+    # arc 2i is corridor i, arc 2i + 1 its reverse: same order as residualGraph
+    tails = np.stack((u, v), axis=1).ravel()
+    heads = np.stack((v, u), axis=1).ravel()
+    capacities = np.stack((capacity, np.zeros(m, dtype=np.int64)), axis=1).ravel()
+
+    order = np.argsort(tails, kind='stable')
+    position = np.empty(2 * m, dtype=np.int64)
+    position[order] = np.arange(2 * m)
+    pair = np.arange(2 * m) ^ 1
+
+    start = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tails, minlength=n), out=start[1:])
+
+    return (start.tolist(), heads[order].tolist(), capacities[order].tolist(),
+            position[pair[order]].tolist())
+
+
+def edgeFileSolution(entrances, exits, filename, n=None):
+    """Maximum flow for a building stored as an edge file"""
+    u, v, capacity = readEdgeFile(filename)
+    if n is None:
+        n = 1 + max([int(u.max()) if len(u) else 0, int(v.max()) if len(v) else 0]
+                    + list(entrances) + list(exits))
+    return multiDinic(arrayResidualGraph(n, u, v, capacity), entrances, exits)
+
+
+# Incremental mode -------------------------------------------------------------
+#
+# The residual graph already holds the current flow, so after a change most of
+# it is still good. Here the super source and sink are real rooms, with a
+# corridor to (from) every room whose capacity is unlimited for the entrances
+# (exits) and 0 for the rest, so changing entrances and exits is just changing
+# capacities. Then:
+# - more capacity: the flow is still valid, Dinic only looks for the extra
+#   augmenting paths,
+# - less capacity than the flow through a corridor u -> v: the flow above the
+#   new capacity is rerouted from u to v through the rest of the building, and
+#   whatever can't be is cancelled, pushing it from u back to the super source
+#   and from the super sink back to v along the residual graph.
+
+class FlowNetwork(object):
+    """
+    A building whose maximum flow is kept up to date while its corridor
+    capacities, entrances and exits change. Corridors are (u, v, capacity)
+    and are referred to by their index in edges.
+    """
+
+    INFINITE = 2000000*50
+
+    def __init__(self, n, edges, entrances, exits):
+        self.n = n
+        self.corridors = len(edges)
+        self.source = n
+        self.sink = n + 1
+
+        entrances, exits = set(entrances), set(exits)
+        edges = [tuple(edge) for edge in edges]
+        edges.extend((self.source, room, self.INFINITE if room in entrances else 0)
+                     for room in range(n))
+        edges.extend((room, self.sink, self.INFINITE if room in exits else 0)
+                     for room in range(n))
+
+        self.edges = edges
+        self.forward = []
+        self.graph = residualGraph(n + 2, edges, self.forward)
+        self.limits = [c for _, _, c in edges]
+        self.maxflow = dinic(self.graph, self.source, self.sink)
+
+    def flow(self, corridor):
+        """Bunnies going through a corridor at a time"""
+        _, _, capacity, _ = self.graph
+        return self.limits[corridor] - capacity[self.forward[corridor]]
+
+    def setCapacity(self, corridor, limit):
+        """Change the capacity of a corridor. Returns the new maximum flow"""
+        self.changeLimit(corridor, limit)
+        self.maxflow += dinic(self.graph, self.source, self.sink)
+        return self.maxflow
+
+    def setEntrances(self, entrances):
+        """Change the set of entrances. Returns the new maximum flow"""
+        return self.setTerminals(entrances, self.corridors)
+
+    def setExits(self, exits):
+        """Change the set of exits. Returns the new maximum flow"""
+        return self.setTerminals(exits, self.corridors + self.n)
+
+    def setTerminals(self, rooms, first):
+        """Open the super corridors first + room for rooms, close the rest"""
+        rooms = set(rooms)
+        for room in range(self.n):
+            limit = self.INFINITE if room in rooms else 0
+            if self.limits[first + room] != limit:
+                self.changeLimit(first + room, limit)
+        self.maxflow += dinic(self.graph, self.source, self.sink)
+        return self.maxflow
+
+    def changeLimit(self, corridor, limit):
+        """
+        Set a corridor capacity keeping a valid flow (not yet a maximum one,
+        if the capacity grows).
+        """
+        _, _, capacity, reverse = self.graph
+        arc = self.forward[corridor]
+        flow = self.limits[corridor] - capacity[arc]
+
+        if limit >= flow:
+            capacity[arc] += limit - self.limits[corridor]
+            self.limits[corridor] = limit
+            return
+
+        # keep as much flow as fits, then fix the rest
+        excess = flow - limit
+        capacity[arc] = 0
+        capacity[reverse[arc]] = limit
+        self.limits[corridor] = limit
+
+        u, v, _ = self.edges[corridor]
+        moved = multiDinic(self.graph, [u], [v], excess)
+        cancelled = excess - moved
+        if cancelled:
+            # every unit is part of a path from the source, and one to the sink
+            if u != self.source:
+                multiDinic(self.graph, [u], [self.source], cancelled)
+            if v != self.sink:
+                multiDinic(self.graph, [self.sink], [v], cancelled)
+            self.maxflow -= cancelled